@@ -22,7 +22,7 @@ def check_file(path, must_startwith):
     print(f"OK: {path}")
     return True
 
-if __name__ == "__main__":
+def main():
     ok = True
     for file, startswith in REQUIRED_FILES.items():
         ok = check_file(file, startswith) and ok
@@ -32,4 +32,5 @@ if __name__ == "__main__":
     else:
         print("All data files are present and look valid.")
 
-
+if __name__ == "__main__":
+    main()
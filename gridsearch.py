@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Grid search over hmmbuild parameters for the Kunitz seed alignment.
+
+Each variant combines a sequence weighting scheme, an effective sequence
+number strategy, a --symfrac value and a seed subset. Variants are built and
+scored in a process pool; every worker searches the same combined target
+database (validation + negative sequences, written once per grid run) with
+single-threaded hmmbuild/hmmsearch so the pool, not HMMER, uses the cores.
+
+Variants are ranked by MCC at the configured E-value cutoff, then by AUPRC
+computed from the full-sequence bit scores. The shared database is searched
+with -Z set to its total size; since full-sequence E-values scale linearly
+with Z, each target's E-value is rescaled to the size of its own FASTA file,
+giving the same E-value hmm.py reports when it searches that set alone.
+"""
+
+import itertools
+import os
+import random
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from hmm import evaluate_performance, load_config, load_labels, parse_tblout_scores
+
+# Default grid (4 x 3 x 3 x 2 = 72 variants); override with a `grid_search`
+# section in config.yaml using the same keys.
+DEFAULT_GRID = {
+    "weighting": ["wpb", "wgsc", "wblosum", "wnone"],
+    "effective": ["eent", "eclust", "enone"],
+    "symfrac": [0.3, 0.5, 0.7],
+    "seed_fraction": [1.0, 0.8],
+}
+
+# Wide reporting threshold so every variant ranks enough targets for AUPRC
+SEARCH_E_VALUE = 10.0
+
+# ---------- Variant preparation ----------
+
+def expand_grid(grid: Dict) -> List[Dict]:
+    keys = list(DEFAULT_GRID)
+    values = [grid.get(k, DEFAULT_GRID[k]) for k in keys]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+def variant_name(params: Dict) -> str:
+    return f"{params['weighting']}_{params['effective']}_sym{params['symfrac']}_seed{params['seed_fraction']}"
+
+def hmmbuild_options(params: Dict, log_file: Path) -> List[str]:
+    return ["-o", str(log_file), "--cpu", "1", f"--{params['weighting']}", f"--{params['effective']}",
+            "--symfrac", str(params["symfrac"])]
+
+def subset_stockholm(sto_path: Path, out_path: Path, fraction: float, seed: int = 0) -> int:
+    """Write a Stockholm file keeping a random fraction of the sequences."""
+    names = []
+    with open(sto_path) as f:
+        for line in f:
+            if line.startswith("#") or line.startswith("//") or not line.strip():
+                continue
+            name = line.split()[0]
+            if name not in names:
+                names.append(name)
+    keep = set(random.Random(seed).sample(names, max(2, round(len(names) * fraction))))
+    with open(sto_path) as f, open(out_path, "w") as out:
+        for line in f:
+            parts = line.split()
+            if line.startswith(("#=GS", "#=GR")) and len(parts) > 1 and parts[1] not in keep:
+                continue
+            if parts and not line.startswith("#") and not line.startswith("//") and parts[0] not in keep:
+                continue
+            out.write(line)
+    return len(keep)
+
+def build_target_db(fasta_files: List[Path], out_path: Path) -> Tuple[Dict[str, int], int]:
+    """Concatenate the target FASTA files into one database shared by all variants.
+
+    Returns the size (number of sequences) of the source file of each target
+    ID, and the total number of sequences in the database (its -Z value).
+    """
+    set_size = {}
+    db_size = 0
+    with open(out_path, "wb") as out:
+        for fasta in fasta_files:
+            with open(fasta, "rb") as f:
+                ids = [line[1:].split()[0].decode() for line in f if line.startswith(b">")]
+                f.seek(0)
+                shutil.copyfileobj(f, out)
+                # Keep the next file's first header on its own line
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b"\n":
+                        out.write(b"\n")
+            set_size.update(dict.fromkeys(ids, len(ids)))
+            db_size += len(ids)
+    return set_size, db_size
+
+def run_tool(cmd: List[str]):
+    """Run an HMMER command, raising with its stderr on failure (for pool workers)."""
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(cmd)} failed:\n{proc.stderr.strip()}")
+
+# ---------- Scoring ----------
+
+def average_precision(scores: Dict[str, float], positives: Set[str], negatives: Set[str]) -> float:
+    """Area under the precision-recall curve; positives without a hit count as missed.
+
+    Targets with equal scores form one threshold step (their precision is
+    taken after the whole tie), so the result does not depend on ID order.
+    """
+    if not positives:
+        return 0
+    ranked = sorted(((s, seq_id) for seq_id, s in scores.items() if seq_id in positives or seq_id in negatives),
+                    reverse=True)
+    tp = seen = 0
+    ap = 0.0
+    for _, group in itertools.groupby(ranked, key=lambda item: item[0]):
+        group_pos = 0
+        for _, seq_id in group:
+            seen += 1
+            group_pos += seq_id in positives
+        tp += group_pos
+        ap += group_pos * tp / seen
+    return ap / len(positives)
+
+def score_variant(params: Dict, sto_file: Path, target_db: Path, set_size: Dict[str, int], db_size: int,
+                  variant_dir: Path, positives: Set[str], negatives: Set[str], e_value: float) -> Dict:
+    """Build one HMM variant, search the shared target database and compute MCC/AUPRC."""
+    variant_dir.mkdir(parents=True, exist_ok=True)
+    seed_file = sto_file
+    if params["seed_fraction"] < 1.0:
+        seed_file = variant_dir / "seed.sto"
+        subset_stockholm(sto_file, seed_file, params["seed_fraction"])
+    hmm_file = variant_dir / "kunitz.hmm"
+    run_tool(["hmmbuild", *hmmbuild_options(params, variant_dir / "hmmbuild.log"), str(hmm_file), str(seed_file)])
+    tbl = variant_dir / "hmmsearch_grid.tbl"
+    run_tool(["hmmsearch", "--tblout", str(tbl), "-E", str(SEARCH_E_VALUE), "-Z", str(db_size),
+              "--cpu", "1", "-o", os.devnull, str(hmm_file), str(target_db)])
+    hits = parse_tblout_scores(tbl)
+    # Rescale E-values from the combined database to each target's own set
+    predicted = {seq_id for seq_id, (evalue, _) in hits.items()
+                 if evalue * set_size.get(seq_id, db_size) / db_size <= e_value}
+    metrics = evaluate_performance(predicted, positives, negatives)
+    metrics["auprc"] = average_precision({k: v[1] for k, v in hits.items()}, positives, negatives)
+    return dict(variant=variant_name(params), **params, **metrics)
+
+# ---------- Grid run ----------
+
+def run_grid(config: Dict, grid: Dict = None, workers: int = None) -> List[Dict]:
+    # Kept apart from results/run_* so "latest run" lookups never pick a grid run
+    grid_dir = Path(config["output_dir"]) / f"grid_{datetime.now().strftime('%Y%m%d_%H%M')}"
+    grid_dir.mkdir(parents=True, exist_ok=True)
+    sto_file = Path(config["seed_alignment"])
+    e_value = config["e_value_cutoff"]
+
+    positives, negatives = load_labels(Path(config["validation_labels"]))
+    negatives |= load_labels(Path(config["negative_labels"]))[1]
+    target_db = grid_dir / "targets.fasta"
+    set_size, db_size = build_target_db([Path(config["validation_fasta"]), Path(config["negative_fasta"])], target_db)
+
+    variants = expand_grid(grid or config.get("grid_search") or {})
+    workers = workers or os.cpu_count()
+    print(f"Scoring {len(variants)} HMM variants with {workers} workers")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(score_variant, params, sto_file, target_db, set_size, db_size,
+                               grid_dir / variant_name(params), positives, negatives, e_value): params
+                   for params in variants}
+        try:
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except (Exception, SystemExit) as e:
+                    print(f"Variant {variant_name(futures[future])} failed: {e}", file=sys.stderr)
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+    results.sort(key=lambda r: (r["mcc"], r["auprc"]), reverse=True)
+    write_results(results, grid_dir / "grid_results.tsv")
+    return results
+
+def write_results(results: List[Dict], tsv_path: Path):
+    if not results:
+        print("No variant completed.", file=sys.stderr)
+        return
+    columns = list(results[0])
+    with open(tsv_path, "w") as f:
+        f.write("\t".join(columns) + "\n")
+        for row in results:
+            f.write("\t".join(f"{row[c]:.4f}" if isinstance(row[c], float) and c not in ("symfrac", "seed_fraction")
+                              else str(row[c]) for c in columns) + "\n")
+    print(f"Ranked results saved to {tsv_path}")
+
+def main(config_file: Path = None, workers: int = None, top: int = 10):
+    config = load_config(config_file, make_run_dir=False)
+    results = run_grid(config, workers=workers)
+    print(f"\nTop {min(top, len(results))} variants (by MCC, then AUPRC):")
+    for r in results[:top]:
+        print(f"  {r['variant']}: MCC={r['mcc']:.3f} AUPRC={r['auprc']:.3f} TP={r['TP']} FP={r['FP']} FN={r['FN']}")
+
+if __name__ == "__main__":
+    main()
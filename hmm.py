@@ -9,10 +9,11 @@ import os
 import sys
 import subprocess
 from pathlib import Path
-from typing import Dict, Set, Tuple
-import yaml
+from typing import Dict, List, Set, Tuple
 from datetime import datetime
-from Bio import SeqIO
+
+# Biopython and PyYAML are imported inside the functions that need them so
+# that short CLI invocations (config checks, tblout parsing) start quickly.
 
 # ---------- Biopython-based utilities ----------
 
@@ -34,10 +35,12 @@ def sto_to_ungapped_fasta(sto_path, fasta_path):
     print(f"Converted {len(seqs)} sequences from {sto_path} to {fasta_path}")
 
 def sto_to_fasta(sto_path, fasta_path):
+    from Bio import SeqIO
     count = SeqIO.write(SeqIO.parse(sto_path, "stockholm"), fasta_path, "fasta")
     print(f"Converted {count} sequences from {sto_path} to {fasta_path}")
 
 def fasta_to_label_txt(fasta_path, txt_path, label="1"):
+    from Bio import SeqIO
     count = 0
     with open(txt_path, "w") as txt:
         for record in SeqIO.parse(fasta_path, "fasta"):
@@ -46,6 +49,7 @@ def fasta_to_label_txt(fasta_path, txt_path, label="1"):
     print(f"Wrote {count} sequence labels to {txt_path}")
 
 def check_stockholm(path):
+    from Bio import SeqIO
     try:
         with open(path) as f:
             next(SeqIO.parse(f, "stockholm"))
@@ -55,6 +59,7 @@ def check_stockholm(path):
         return False
 
 def check_fasta(path):
+    from Bio import SeqIO
     try:
         with open(path) as f:
             next(SeqIO.parse(f, "fasta"))
@@ -87,7 +92,8 @@ def find_config() -> Path:
             return path.resolve()
     raise FileNotFoundError("config.yaml not found!")
 
-def load_config(config_file: Path = None) -> Dict:
+def load_config(config_file: Path = None, make_run_dir: bool = True) -> Dict:
+    import yaml
     if config_file is None:
         config_file = find_config()
     required_fields = {
@@ -113,6 +119,8 @@ def load_config(config_file: Path = None) -> Dict:
                     config[field] = float(config[field])
                 else:
                     raise ValueError(f"Invalid type for {field}, expected {field_type.__name__}")
+        if not make_run_dir:
+            return config
         run_id = datetime.now().strftime("%Y%m%d_%H%M")
         output_dir = Path(config['output_dir']) / f"run_{run_id}"
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -124,8 +132,8 @@ def load_config(config_file: Path = None) -> Dict:
 
 # ---------- HMM and metrics functions ----------
 
-def run_hmmbuild(seed_alignment: Path, hmm_file: Path):
-    cmd = ["hmmbuild", str(hmm_file), str(seed_alignment)]
+def run_hmmbuild(seed_alignment: Path, hmm_file: Path, options: List[str] = None):
+    cmd = ["hmmbuild", *(options or []), str(hmm_file), str(seed_alignment)]
     print(f"Building HMM: {' '.join(cmd)}")
     try:
         subprocess.run(cmd, check=True)
@@ -133,12 +141,14 @@ def run_hmmbuild(seed_alignment: Path, hmm_file: Path):
         print(f"hmmbuild failed: {e}", file=sys.stderr)
         sys.exit(1)
 
-def run_hmmsearch(hmm_file: Path, fasta_file: Path, output_dir: Path, tag: str = "validation", e_value: float = 1e-5) -> Path:
+def run_hmmsearch(hmm_file: Path, fasta_file: Path, output_dir: Path, tag: str = "validation", e_value: float = 1e-5,
+                  options: List[str] = None) -> Path:
     tblout = output_dir / f"hmmsearch_{tag}.tbl"
     cmd = [
         "hmmsearch",
         "--tblout", str(tblout),
         "-E", str(e_value),
+        *(options or []),
         str(hmm_file), str(fasta_file)
     ]
     print(f"Running hmmsearch: {' '.join(cmd)}")
@@ -164,6 +174,25 @@ def parse_tblout(tbl_file: Path) -> Set[str]:
         print(f"Error parsing tblout file: {e}", file=sys.stderr)
         sys.exit(1)
 
+def parse_tblout_scores(tbl_file: Path) -> Dict[str, Tuple[float, float]]:
+    """Map each target to its best (full-sequence E-value, bit score)."""
+    scores = {}
+    try:
+        with open(tbl_file) as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                parts = line.split()
+                if len(parts) < 6:
+                    continue
+                evalue, score = float(parts[4]), float(parts[5])
+                if parts[0] not in scores or score > scores[parts[0]][1]:
+                    scores[parts[0]] = (evalue, score)
+        return scores
+    except Exception as e:
+        print(f"Error parsing tblout file: {e}", file=sys.stderr)
+        sys.exit(1)
+
 def load_labels(label_file: Path) -> Tuple[Set[str], Set[str]]:
     pos, neg = set(), set()
     try:
@@ -183,12 +212,17 @@ def evaluate_performance(predicted: Set[str], positives: Set[str], negatives: Se
     fp = len(predicted & negatives)
     fn = len(positives - predicted)
     tn = len(negatives - predicted)
+    return metrics_from_counts(tp, fp, fn, tn)
+
+def metrics_from_counts(tp: int, fp: int, fn: int, tn: int) -> Dict:
     total = tp + tn + fp + fn
     acc = (tp + tn) / total if total else 0
     prec = tp / (tp + fp) if (tp + fp) else 0
     rec = tp / (tp + fn) if (tp + fn) else 0
     f1 = 2 * prec * rec / (prec + rec) if (prec + rec) else 0
-    return dict(TP=tp, FP=fp, FN=fn, TN=tn, accuracy=acc, precision=prec, recall=rec, f1=f1)
+    denom = ((tp + fp) * (tp + fn) * (tn + fp) * (tn + fn)) ** 0.5
+    mcc = (tp * tn - fp * fn) / denom if denom else 0
+    return dict(TP=tp, FP=fp, FN=fn, TN=tn, accuracy=acc, precision=prec, recall=rec, f1=f1, mcc=mcc)
 
 def run_hmmlogo(hmm_file: Path, output_dir: Path):
     logo_file = output_dir / "hmm_logo.png"
@@ -203,8 +237,8 @@ def run_hmmlogo(hmm_file: Path, output_dir: Path):
 
 # ---------- Main pipeline ----------
 
-if __name__ == "__main__":
-    CONFIG = load_config()
+def main(config_file: Path = None):
+    CONFIG = load_config(config_file)
 
     sto_file = Path(CONFIG["seed_alignment"])
     validation_fasta = Path(CONFIG["validation_fasta"])
@@ -289,4 +323,15 @@ if __name__ == "__main__":
     # Generate HMM logo
     run_hmmlogo(hmm_file, output_dir)
 
+    # Aggregate SwissProt hits into Parquet tables and an HTML report; a
+    # reporting failure should not discard the finished searches
+    from report import build_report
+    try:
+        build_report(output_dir, tag="swissprot", config=CONFIG)
+    except Exception as e:
+        print(f"Warning: hit report failed: {e}", file=sys.stderr)
+
     print(f"\n✅ Pipeline finished. Results saved to: {output_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Single command-line entry point for the Kunitz HMM pipeline scripts.
+
+Subcommands wrap hmm.py, check_data.py, overlap.py, novelty_check.py,
+visualize_metrics.py, report.py and gridsearch.py. Only the standard
+library is imported at module load; each subcommand imports its script
+(and that script's heavy dependencies) when it runs, so quick invocations
+from workflow managers stay cheap.
+
+Examples:
+    python kunitz.py run
+    python kunitz.py check-config
+    python kunitz.py hits results/run_20250521_1315/hmmsearch_swissprot.tbl
+    python kunitz.py novelty --accession P00974
+    python kunitz.py report results/run_20250521_1315
+    python kunitz.py grid --workers 16
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# ---------- Subcommand handlers ----------
+
+def cmd_run(args):
+    import hmm
+    hmm.main(args.config)
+
+def cmd_check_config(args):
+    import hmm
+    config = hmm.load_config(args.config, make_run_dir=False)
+    for key, val in config.items():
+        print(f"  {key}: {val}")
+    print("Configuration OK.")
+
+def cmd_check_data(args):
+    import check_data
+    check_data.main()
+
+def cmd_overlap(args):
+    import overlap
+    overlap.main(args.seed, args.fasta)
+
+def cmd_hits(args):
+    import hmm
+    hits = hmm.parse_tblout(args.tblout)
+    for seq_id in sorted(hits):
+        print(seq_id)
+    print(f"{len(hits)} unique hits", file=sys.stderr)
+
+def cmd_novelty(args):
+    import novelty_check
+    if args.accession:
+        for acc in args.accession:
+            status = "known" if novelty_check.is_kunitz_annotated(acc) else "NOVEL"
+            print(f"{acc}\t{status}")
+        return
+    novelty_check.main(args.tblout, args.output)
+
+def cmd_report(args):
+    import report
+    report.main(args.run_dir, args.tag, args.config, args.bin_width, parquet=not args.no_parquet,
+                labels=args.labels, negative_labels=args.negative_labels)
+
+def cmd_grid(args):
+    import gridsearch
+    gridsearch.main(args.config, args.workers, args.top)
+
+def cmd_plot_metrics(args):
+    import hmm
+    import visualize_metrics
+    metrics = hmm.metrics_from_counts(args.tp, args.fp, args.fn, args.tn)
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    visualize_metrics.plot_confusion_bar(metrics, args.out_dir / "confusion_bar.png")
+    visualize_metrics.plot_metrics_summary(metrics, args.out_dir / "metrics_summary.png")
+    print(f"Metric plots saved to {args.out_dir}")
+
+# ---------- Argument parsing ----------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="kunitz", description="Kunitz domain profile HMM pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="build the HMM, validate it and annotate SwissProt")
+    p.add_argument("--config", type=Path, default=None, help="path to config.yaml")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("check-config", help="validate config.yaml without creating a run directory")
+    p.add_argument("--config", type=Path, default=None, help="path to config.yaml")
+    p.set_defaults(func=cmd_check_config)
+
+    p = sub.add_parser("check-data", help="check that the required data files exist and look valid")
+    p.set_defaults(func=cmd_check_data)
+
+    p = sub.add_parser("overlap", help="report sequence IDs shared by the seed and validation sets")
+    p.add_argument("--seed", default="data/kunitz_seed.sto")
+    p.add_argument("--fasta", default="data/validation.fasta")
+    p.set_defaults(func=cmd_overlap)
+
+    p = sub.add_parser("hits", help="list unique target IDs from an hmmsearch --tblout file")
+    p.add_argument("tblout", type=Path)
+    p.set_defaults(func=cmd_hits)
+
+    p = sub.add_parser("novelty", help="flag hits not already annotated as Kunitz in UniProt")
+    p.add_argument("--tblout", type=Path, default=None,
+                   help="hmmsearch tblout (default: latest results/run_*/hmmsearch_swissprot.tbl)")
+    p.add_argument("--output", default="results/novel_kunitz_candidates.txt")
+    p.add_argument("--accession", nargs="+", help="check only these UniProt accessions")
+    p.set_defaults(func=cmd_novelty)
+
+    p = sub.add_parser("report", help="aggregate a run's hits into Parquet tables and an HTML report")
+    p.add_argument("run_dir", type=Path, nargs="?", default=None,
+                   help="results/run_* directory (default: latest)")
+    p.add_argument("--tag", default="swissprot", help="report on hmmsearch_<tag>.tbl")
+    p.add_argument("--config", type=Path, default=None, help="path to config.yaml")
+    p.add_argument("--bin-width", type=float, default=10.0, help="score histogram bin width (bits)")
+    p.add_argument("--no-parquet", action="store_true", help="only write report.html")
+    p.add_argument("--labels", type=Path, default=None, help="validation labels (default: from config.yaml)")
+    p.add_argument("--negative-labels", type=Path, default=None, help="negative labels (default: from config.yaml)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("grid", help="build and rank hmmbuild parameter variants in parallel")
+    p.add_argument("--config", type=Path, default=None, help="path to config.yaml")
+    p.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    p.add_argument("--top", type=int, default=10, help="number of ranked variants to print")
+    p.set_defaults(func=cmd_grid)
+
+    p = sub.add_parser("plot-metrics", help="plot confusion counts and derived metrics")
+    for name in ("tp", "fp", "fn", "tn"):
+        p.add_argument(name, type=int, help=f"{name.upper()} count")
+    p.add_argument("--out-dir", type=Path, default=Path("results"))
+    p.set_defaults(func=cmd_plot_metrics)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ Works with HMMER .tblout with IDs like sp|P84875|PCPI_SABMA (extracts accession
 
 import os
 from pathlib import Path
-import requests
 import time
 
 def get_latest_results_tbl():
@@ -52,6 +51,7 @@ def is_kunitz_annotated(uniprot_acc):
     """
     Query UniProt API to check for Kunitz annotation in keywords, Pfam, or domain features.
     """
+    import requests  # deferred: only needed once we actually query UniProt
     url = f"https://rest.uniprot.org/uniprotkb/{uniprot_acc}.json"
     try:
         r = requests.get(url, timeout=10)
@@ -75,8 +75,9 @@ def is_kunitz_annotated(uniprot_acc):
         print(f"Warning: failed to fetch or parse UniProt entry for {uniprot_acc}: {e}")
         return False
 
-def main():
-    tbl_file = get_latest_results_tbl()
+def main(tbl_file=None, output_file="results/novel_kunitz_candidates.txt"):
+    if tbl_file is None:
+        tbl_file = get_latest_results_tbl()
     print(f"Using results file: {tbl_file}")
     accessions = load_hmm_hits(tbl_file)
     print(f"Total unique accessions found: {len(accessions)}")
@@ -95,10 +96,10 @@ def main():
     print(f"\nNovel candidate hits (not annotated as Kunitz): {len(novel)}")
     for n in novel:
         print(n)
-    with open("results/novel_kunitz_candidates.txt", "w") as out:
+    with open(output_file, "w") as out:
         for n in novel:
             out.write(n + "\n")
-    print("\nDone. See results/novel_kunitz_candidates.txt for the list.")
+    print(f"\nDone. See {output_file} for the list.")
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,27 @@
 # Check for overlap between seed and validation sets.
-seed_ids = set()
-with open("data/kunitz_seed.sto") as f:
-    for line in f:
-        if line.startswith("#=GS") or line.startswith(">"):
-            name = line.split()[1] if line.startswith("#=GS") else line[1:].strip()
-            seed_ids.add(name.split()[0])
 
-val_ids = set()
-with open("data/validation.fasta") as f:
-    for line in f:
-        if line.startswith(">"):
-            name = line[1:].strip()
-            val_ids.add(name.split()[0])
+def load_seed_ids(sto_path="data/kunitz_seed.sto"):
+    seed_ids = set()
+    with open(sto_path) as f:
+        for line in f:
+            if line.startswith("#=GS") or line.startswith(">"):
+                name = line.split()[1] if line.startswith("#=GS") else line[1:].strip()
+                seed_ids.add(name.split()[0])
+    return seed_ids
 
-overlap = seed_ids & val_ids
-print("Overlap:", overlap)
+def load_fasta_ids(fasta_path="data/validation.fasta"):
+    val_ids = set()
+    with open(fasta_path) as f:
+        for line in f:
+            if line.startswith(">"):
+                name = line[1:].strip()
+                val_ids.add(name.split()[0])
+    return val_ids
+
+def main(sto_path="data/kunitz_seed.sto", fasta_path="data/validation.fasta"):
+    overlap = load_seed_ids(sto_path) & load_fasta_ids(fasta_path)
+    print("Overlap:", overlap)
+    return overlap
+
+if __name__ == "__main__":
+    main()
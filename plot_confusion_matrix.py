@@ -1,13 +1,28 @@
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
-
-# Example confusion matrix counts (replace these with your actual results)
-TP = 58
-FP = 0
-FN = 13
-TN = 29
+from pathlib import Path
+
+from report import confusion_counts, latest_run_dir, load_label_paths
+
+# Confusion matrix counts recomputed from a run's hmmsearch outputs
+# (defaults to the latest results/run_* directory), using the validation
+# and negative label files named in config.yaml
+run_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else latest_run_dir()
+label_paths = load_label_paths()
+if "validation_labels" not in label_paths:
+    print("ERROR: validation_labels is not set in config.yaml")
+    sys.exit(1)
+negative_labels = label_paths.get("negative_labels")
+metrics = confusion_counts(run_dir, Path(label_paths["validation_labels"]),
+                           Path(negative_labels) if negative_labels else None)
+if metrics is None:
+    print(f"ERROR: no hmmsearch_validation.tbl in {run_dir}")
+    sys.exit(1)
+TP, FP, FN, TN = metrics["TP"], metrics["FP"], metrics["FN"], metrics["TN"]
+print(f"Counts from {run_dir}: TP={TP} FP={FP} FN={FN} TN={TN}")
 
 # Build the confusion matrix
 conf_matrix = np.array([[TN, FP],
@@ -40,4 +55,3 @@ plt.savefig('images/confusion_matrix_kunitz.png', dpi=150)
 # plt.show()  # This line is commented out or removed
 
 print("Confusion matrix plot saved to 'images/confusion_matrix_kunitz.png'")
-
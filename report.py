@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Hit report for Kunitz HMM runs.
+
+Streams an hmmsearch --tblout file once, aggregating per-taxon hit counts
+(from the OX= field of UniProt descriptions), a full-sequence score histogram
+and the distribution of domain numbers. Memory depends on the number of
+distinct taxa and score bins, not on the number of hits. Each tblout row
+counts as one hit.
+
+When pyarrow is installed the table is read in fixed-size blocks and each
+block is aggregated with pyarrow.compute on a small thread pool; otherwise
+a plain Python loop is used. The aggregates are written as Parquet tables
+(pyarrow) and rendered into a single self-contained HTML report together
+with the validation confusion counts of the run, when available.
+"""
+
+import html
+import os
+import re
+import sys
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from hmm import evaluate_performance, find_config, load_labels, parse_tblout
+
+# Shared by the re (fallback) and RE2 (pyarrow.compute) code paths; a taxid
+# must be all digits up to whitespace or end of line (OX=123abc is unknown)
+OX_PATTERN = r"OX=(?P<taxid>\d+)(?:\s|$)"
+OS_PATTERN = r"\bOS=(?P<organism>.+?)(?: [A-Z]{2}=|$)"
+OX_RE = re.compile(OX_PATTERN)
+OS_RE = re.compile(OS_PATTERN)
+
+BLOCK_SIZE = 8 << 20  # bytes of tblout parsed per pyarrow batch
+MAX_BATCHES_IN_FLIGHT = 8  # caps pyarrow worker threads and buffered batches
+
+# ---------- Streaming aggregation ----------
+
+def aggregate_hits(tbl_file: Path, bin_width: float = 10.0) -> Dict:
+    """Aggregate a tblout file into taxon, score-histogram and domain-number counts."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        counts = _aggregate_hits_python(tbl_file, bin_width)
+    else:
+        counts = _aggregate_hits_arrow(tbl_file, bin_width)
+    taxa, organisms, score_bins, domains, n_hits = counts
+    return dict(
+        source=str(tbl_file),
+        n_hits=n_hits,
+        bin_width=bin_width,
+        taxa=[(taxid, organisms[taxid], count)
+              for taxid, count in sorted(taxa.items(), key=lambda kv: (-kv[1], kv[0]))],
+        score_histogram=[(b * bin_width, (b + 1) * bin_width, score_bins[b]) for b in sorted(score_bins)],
+        domain_counts=sorted(domains.items()),
+    )
+
+def _aggregate_batch(lines, bin_width: float):
+    """Aggregate one batch of tblout lines (a pyarrow string array)."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    lines = lines.filter(pc.invert(pc.starts_with(lines, "#")))
+    # HMMER fields are ASCII, so the cheaper ASCII splitter is safe
+    parts = pc.ascii_split_whitespace(lines, max_splits=18)
+    keep = pc.greater_equal(pc.list_value_length(parts), 18)
+    lines, parts = lines.filter(keep), parts.filter(keep)
+
+    taxid = pc.fill_null(pc.struct_field(pc.extract_regex(lines, OX_PATTERN), 0), "unknown")
+    grouped = (pa.table({"taxid": taxid, "line": lines})
+               .group_by("taxid", use_threads=False)
+               .aggregate([("line", "first"), ("line", "count", pc.CountOptions(mode="all"))]))
+    taxids = grouped["taxid"].to_pylist()
+    taxa = Counter(dict(zip(taxids, grouped["line_count"].to_pylist())))
+    # The organism regex only runs on one line per distinct taxon
+    names = pc.fill_null(pc.struct_field(pc.extract_regex(grouped["line_first"], OS_PATTERN), 0), "")
+    organisms = dict(zip(taxids, names.to_pylist()))
+
+    score = pc.cast(pc.list_element(parts, 5), pa.float64())
+    bins = pc.cast(pc.floor(pc.divide(score, bin_width)), pa.int64())
+    score_bins = Counter({item["values"]: item["counts"] for item in pc.value_counts(bins).to_pylist()})
+    n_dom = pc.cast(pc.list_element(parts, 15), pa.int64())
+    domains = Counter({item["values"]: item["counts"] for item in pc.value_counts(n_dom).to_pylist()})
+    return len(lines), taxa, organisms, score_bins, domains
+
+def _read_blocks(tbl_file: Path, block_size: int):
+    """Yield the file as byte blocks of about block_size, each ending on a newline."""
+    rest = b""
+    with open(tbl_file, "rb") as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            data = rest + data
+            cut = data.rfind(b"\n") + 1
+            rest = data[cut:]
+            if cut:
+                yield data[:cut]
+    if rest:
+        yield rest + b"\n"
+
+def _aggregate_hits_arrow(tbl_file: Path, bin_width: float, workers: int = None):
+    """Stream the tblout in BLOCK_SIZE batches and aggregate them on a thread pool.
+
+    pyarrow.compute releases the GIL, so batches are aggregated in parallel.
+    At most `workers` batches (default: CPUs, capped at MAX_BATCHES_IN_FLIGHT)
+    are in flight. A batch peaks at about 6 x BLOCK_SIZE (~50 MiB) of Arrow
+    memory while it is split and aggregated, so a run stays around 0.5 GB
+    resident at the cap however large the table or the machine is.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    workers = workers or min(os.cpu_count() or 1, MAX_BATCHES_IN_FLIGHT)
+    taxa, organisms, score_bins, domains = Counter(), {}, Counter(), Counter()
+    n_hits = 0
+
+    def merge(result):
+        nonlocal n_hits
+        n, batch_taxa, batch_organisms, batch_bins, batch_domains = result
+        n_hits += n
+        taxa.update(batch_taxa)
+        for tid, name in batch_organisms.items():
+            organisms.setdefault(tid, name)
+        score_bins.update(batch_bins)
+        domains.update(batch_domains)
+
+    # Blocks are read by hand rather than with pyarrow.csv, whose streaming
+    # reader buffers far ahead of the consumer. Each block becomes one string
+    # array of lines; fields are split on whitespace in _aggregate_batch.
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for block in _read_blocks(tbl_file, BLOCK_SIZE):
+            lines = pc.split_pattern(pa.array([block], pa.large_binary()), "\n").flatten()
+            pending.append(pool.submit(_aggregate_batch, lines.cast(pa.string()), bin_width))
+            if len(pending) >= workers:
+                merge(pending.popleft().result())
+        while pending:
+            merge(pending.popleft().result())
+    return taxa, organisms, score_bins, domains, n_hits
+
+def _aggregate_hits_python(tbl_file: Path, bin_width: float):
+    """Line-by-line fallback used when pyarrow is not installed."""
+    taxa, organisms, score_bins, domains = Counter(), {}, Counter(), Counter()
+    n_hits = 0
+    with open(tbl_file) as f:
+        for line in f:
+            if line[0] == "#":
+                continue
+            parts = line.split(None, 18)
+            if len(parts) < 18:
+                continue
+            n_hits += 1
+            desc = parts[18] if len(parts) > 18 else ""
+            ox = OX_RE.search(desc)
+            taxid = ox.group(1) if ox else "unknown"
+            taxa[taxid] += 1
+            if taxid not in organisms:
+                os_match = OS_RE.search(desc.rstrip("\n"))
+                organisms[taxid] = os_match.group(1) if os_match else ""
+            score_bins[int(float(parts[5]) // bin_width)] += 1
+            domains[int(parts[15])] += 1
+    return taxa, organisms, score_bins, domains, n_hits
+
+# ---------- Validation counts from run outputs ----------
+
+def confusion_counts(run_dir: Path, validation_labels: Path, negative_labels: Optional[Path] = None) -> Optional[Dict]:
+    """Recompute TP/FP/FN/TN and derived metrics from the tblout files of a run."""
+    val_tbl = run_dir / "hmmsearch_validation.tbl"
+    if not val_tbl.exists() or not validation_labels.exists():
+        return None
+    predicted = parse_tblout(val_tbl)
+    positives, negatives = load_labels(validation_labels)
+    neg_tbl = run_dir / "hmmsearch_negative.tbl"
+    if neg_tbl.exists() and negative_labels is not None and negative_labels.exists():
+        predicted |= parse_tblout(neg_tbl)
+        negatives |= load_labels(negative_labels)[1]
+    return evaluate_performance(predicted, positives, negatives)
+
+def load_label_paths(config_file: Path = None) -> Dict:
+    """Read only the label file paths from config.yaml, without full pipeline validation."""
+    import yaml
+
+    if config_file is None:
+        try:
+            config_file = find_config()
+        except FileNotFoundError:
+            return {}
+    with open(config_file) as f:
+        config = yaml.safe_load(f) or {}
+    return {key: config[key] for key in ("validation_labels", "negative_labels") if config.get(key)}
+
+def latest_run_dir(results_dir: Path = Path("results")) -> Path:
+    subdirs = [d for d in results_dir.iterdir() if d.is_dir() and d.name.startswith("run_")]
+    if not subdirs:
+        raise FileNotFoundError(f"No run_* subdirectories in {results_dir}/")
+    return max(subdirs, key=lambda d: d.name)
+
+# ---------- Outputs ----------
+
+def write_parquet(summary: Dict, out_dir: Path):
+    """Write the aggregates as taxa/score_histogram/domain_counts Parquet tables."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("Warning: pyarrow is not installed, skipping Parquet tables.", file=sys.stderr)
+        return
+
+    taxid, organism, hits = zip(*summary["taxa"]) if summary["taxa"] else ((), (), ())
+    pq.write_table(pa.table({"taxid": list(taxid), "organism": list(organism), "hits": list(hits)}),
+                   out_dir / "report_taxa.parquet")
+    lo, hi, hits = zip(*summary["score_histogram"]) if summary["score_histogram"] else ((), (), ())
+    pq.write_table(pa.table({"score_min": list(lo), "score_max": list(hi), "hits": list(hits)}),
+                   out_dir / "report_score_histogram.parquet")
+    n_dom, hits = zip(*summary["domain_counts"]) if summary["domain_counts"] else ((), ())
+    pq.write_table(pa.table({"domains": list(n_dom), "hits": list(hits)}),
+                   out_dir / "report_domain_counts.parquet")
+
+def _bar_chart(rows, label_fmt, width=560, bar_h=16) -> str:
+    """Inline SVG horizontal bar chart for (label, count) rows."""
+    if not rows:
+        return "<p>No data.</p>"
+    top = max(count for _, count in rows) or 1
+    height = bar_h * len(rows) + 4
+    parts = [f'<svg width="{width + 260}" height="{height}" xmlns="http://www.w3.org/2000/svg">']
+    for i, (label, count) in enumerate(rows):
+        y = i * bar_h + 2
+        w = max(1, int(width * count / top))
+        parts.append(f'<text x="0" y="{y + bar_h - 4}" font-size="11">{html.escape(label_fmt(label))}</text>'
+                     f'<rect x="160" y="{y}" width="{w}" height="{bar_h - 3}" fill="#4a7fb5"/>'
+                     f'<text x="{165 + w}" y="{y + bar_h - 4}" font-size="11">{count}</text>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+def render_html(summary: Dict, metrics: Optional[Dict], html_path: Path, max_taxa: int = 30):
+    """Render one self-contained HTML report (inline SVG, no external assets)."""
+    sections = [f"<h1>Kunitz HMM hit report</h1><p>Source: <code>{html.escape(summary['source'])}</code><br>"
+                f"Total hits: <b>{summary['n_hits']}</b>, distinct taxa: <b>{len(summary['taxa'])}</b></p>"]
+    if metrics:
+        cells = "".join(f"<tr><td>{k}</td><td>{v:.3f}</td></tr>" if isinstance(v, float)
+                        else f"<tr><td>{k}</td><td>{v}</td></tr>" for k, v in metrics.items())
+        sections.append(f"<h2>Validation performance</h2><table>{cells}</table>")
+    taxa_rows = [(f"{taxid} {organism}".strip(), count) for taxid, organism, count in summary["taxa"][:max_taxa]]
+    sections.append(f"<h2>Hits per taxon (top {max_taxa})</h2>" + _bar_chart(taxa_rows, lambda s: s[:28]))
+    score_rows = [((lo, hi), count) for lo, hi, count in summary["score_histogram"]]
+    sections.append("<h2>Full-sequence score distribution (bits)</h2>"
+                    + _bar_chart(score_rows, lambda b: f"{b[0]:g} - {b[1]:g}"))
+    sections.append("<h2>Domains per hit</h2>"
+                    + _bar_chart(summary["domain_counts"], lambda n: f"{n} domain(s)"))
+    with open(html_path, "w") as f:
+        f.write("<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Kunitz HMM hit report</title>"
+                "<style>body{font-family:sans-serif;margin:2em}td{padding:2px 10px}</style></head><body>")
+        f.write("\n".join(sections))
+        f.write("</body></html>\n")
+
+def build_report(run_dir: Path, tag: str = "swissprot", config: Optional[Dict] = None,
+                 bin_width: float = 10.0, parquet: bool = True) -> Path:
+    """Aggregate run_dir/hmmsearch_<tag>.tbl and write Parquet tables plus report.html."""
+    tbl_file = run_dir / f"hmmsearch_{tag}.tbl"
+    if not tbl_file.exists():
+        raise FileNotFoundError(f"{tbl_file} does not exist.")
+    summary = aggregate_hits(tbl_file, bin_width)
+    metrics = None
+    if config and config.get("validation_labels"):
+        negative_labels = config.get("negative_labels")
+        metrics = confusion_counts(run_dir, Path(config["validation_labels"]),
+                                   Path(negative_labels) if negative_labels else None)
+    if parquet:
+        write_parquet(summary, run_dir)
+    html_path = run_dir / "report.html"
+    render_html(summary, metrics, html_path)
+    print(f"Report for {summary['n_hits']} hits saved to {html_path}")
+    return html_path
+
+def main(run_dir: Optional[Path] = None, tag: str = "swissprot", config_file: Path = None,
+         bin_width: float = 10.0, parquet: bool = True, labels: Path = None, negative_labels: Path = None):
+    try:
+        if run_dir is None:
+            run_dir = latest_run_dir()
+        config = load_label_paths(config_file)
+        if labels is not None:
+            config["validation_labels"] = labels
+        if negative_labels is not None:
+            config["negative_labels"] = negative_labels
+        return build_report(run_dir, tag, config, bin_width, parquet)
+    except Exception as e:
+        print(f"Report generation failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]) if len(sys.argv) > 1 else None)
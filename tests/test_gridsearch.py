@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+import gridsearch
+
+REPO = Path(__file__).resolve().parent.parent
+SEED_STO = REPO / "stockholm/kunitz_seed.sto"
+
+def test_expand_grid_defaults_and_override():
+    assert len(gridsearch.expand_grid({})) == 72
+    variants = gridsearch.expand_grid({"weighting": ["wpb"], "symfrac": [0.5]})
+    assert len(variants) == 6
+    assert {v["weighting"] for v in variants} == {"wpb"}
+    assert {v["symfrac"] for v in variants} == {0.5}
+
+def test_hmmbuild_options_single_threaded():
+    params = gridsearch.expand_grid({})[0]
+    options = gridsearch.hmmbuild_options(params, Path("build.log"))
+    assert options[options.index("--cpu") + 1] == "1"
+    assert "--wpb" in options and "--eent" in options
+
+def test_average_precision():
+    # Ranking a(+) b(-) c(+); d(+) is never hit: (1/1 + 2/3) / 3
+    scores = {"a": 10.0, "b": 9.0, "c": 8.0}
+    ap = gridsearch.average_precision(scores, {"a", "c", "d"}, {"b"})
+    assert ap == pytest.approx((1 + 2 / 3) / 3)
+
+def test_average_precision_ties_ignore_id_order():
+    # One positive and one negative tied at the top: precision 1/2 either way
+    for pos, neg in (("a", "z"), ("z", "a")):
+        ap = gridsearch.average_precision({pos: 5.0, neg: 5.0}, {pos}, {neg})
+        assert ap == pytest.approx(0.5)
+
+def seq_rows(path):
+    names, gs_names = [], []
+    for line in path.read_text().splitlines():
+        if line.startswith("#=GS"):
+            gs_names.append(line.split()[1])
+        elif line.strip() and not line.startswith(("#", "//")):
+            names.append(line.split()[0])
+    return names, gs_names
+
+def test_subset_stockholm_keeps_gs_and_rows_in_step(tmp_path):
+    names, gs_names = seq_rows(SEED_STO)
+    assert len(names) == 99
+    out = tmp_path / "seed.sto"
+    assert gridsearch.subset_stockholm(SEED_STO, out, 0.8) == 79
+    kept, kept_gs = seq_rows(out)
+    assert len(kept) == 79
+    assert set(kept) == set(kept_gs)
+    assert set(kept) <= set(names)
+    assert out.read_text().startswith("# STOCKHOLM 1.0")
+    assert out.read_text().rstrip().endswith("//")
+
+def test_build_target_db_set_sizes(tmp_path):
+    a = tmp_path / "a.fasta"
+    b = tmp_path / "b.fasta"
+    a.write_text(">p1 x\nAAA\n>p2\nCCC")  # no trailing newline
+    b.write_text(">n1\nGGG\n")
+    db = tmp_path / "db.fasta"
+    set_size, db_size = gridsearch.build_target_db([a, b], db)
+    assert set_size == {"p1": 2, "p2": 2, "n1": 1}
+    assert db_size == 3
+    assert db.read_text() == ">p1 x\nAAA\n>p2\nCCC\n>n1\nGGG\n"
+
+def test_run_tool_raises_with_stderr():
+    cmd = [sys.executable, "-c", "import sys; sys.exit('Error: bad alignment')"]
+    with pytest.raises(RuntimeError, match="bad alignment"):
+        gridsearch.run_tool(cmd)
+
+def test_run_grid_writes_outside_run_dirs(tmp_path):
+    fasta = tmp_path / "val.fasta"
+    fasta.write_text(">p1\nAAA\n")
+    labels = tmp_path / "val_labels.txt"
+    labels.write_text("p1\t1\n")
+    config = dict(output_dir=str(tmp_path / "results"), seed_alignment=str(SEED_STO),
+                  validation_fasta=str(fasta), validation_labels=str(labels),
+                  negative_fasta=str(fasta), negative_labels=str(labels), e_value_cutoff=0.001)
+    grid = {"weighting": ["wpb"], "effective": ["eent"], "symfrac": [0.5], "seed_fraction": [1.0]}
+    gridsearch.run_grid(config, grid, workers=1)
+    dirs = [d.name for d in (tmp_path / "results").iterdir()]
+    assert len(dirs) == 1 and dirs[0].startswith("grid_")
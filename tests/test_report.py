@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+
+import report
+
+REPO = Path(__file__).resolve().parent.parent
+SWISSPROT_TBL = REPO / "results/run_20250521_1315/hmmsearch_swissprot.tbl"
+
+def check_swissprot_summary(taxa, organisms, score_bins, domains, n_hits):
+    assert n_hits == 394
+    assert len(taxa) == 120
+    assert sum(taxa.values()) == 394
+    assert taxa["9606"] == 18
+    assert organisms["9606"] == "Homo sapiens"
+    assert sorted(domains.items())[:3] == [(1, 316), (2, 50), (3, 19)]
+    assert sum(score_bins.values()) == 394
+
+def test_aggregate_python_fallback():
+    check_swissprot_summary(*report._aggregate_hits_python(SWISSPROT_TBL, 10.0))
+
+def test_aggregate_arrow_matches_fallback(monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(report, "BLOCK_SIZE", 4096)  # force many batches
+    arrow = report._aggregate_hits_arrow(SWISSPROT_TBL, 10.0, workers=3)
+    check_swissprot_summary(*arrow)
+    assert arrow == report._aggregate_hits_python(SWISSPROT_TBL, 10.0)
+
+def test_aggregate_hits_summary():
+    summary = report.aggregate_hits(SWISSPROT_TBL, bin_width=10.0)
+    assert summary["n_hits"] == 394
+    assert summary["taxa"][0] == ("209901", "Cyriopagopus hainanus", 30)
+    assert summary["domain_counts"][0] == (1, 316)
+    for lo, hi, _ in summary["score_histogram"]:
+        assert hi - lo == 10.0
+
+def test_malformed_ox_maps_to_unknown(tmp_path):
+    row = SWISSPROT_TBL.read_text().splitlines()[3].split(" Papilin")[0]
+    tbl = tmp_path / "edge.tbl"
+    tbl.write_text(row + " Papilin OS=Drosophila melanogaster OX=\n"
+                   + row + " Papilin OS=Drosophila melanogaster OX=123abc GN=Ppn\n")
+    taxa, organisms, _, _, n_hits = report._aggregate_hits_python(tbl, 10.0)
+    assert n_hits == 2
+    assert taxa == {"unknown": 2}
+    assert organisms["unknown"] == "Drosophila melanogaster"
+    pytest.importorskip("pyarrow")
+    assert report._aggregate_hits_arrow(tbl, 10.0)[:2] == (taxa, organisms)
+
+def test_empty_tblout(tmp_path):
+    tbl = tmp_path / "empty.tbl"
+    tbl.write_text("")
+    assert report.aggregate_hits(tbl)["n_hits"] == 0
+    assert report._aggregate_hits_python(tbl, 10.0)[4] == 0
+
+def test_main_exits_on_missing_tblout(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exc:
+        report.main(tmp_path, labels=tmp_path / "labels.txt")
+    assert exc.value.code == 1
+    assert "does not exist" in capsys.readouterr().err
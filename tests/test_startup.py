@@ -0,0 +1,51 @@
+"""Startup regression tests: the CLI and the modules it imports must not pull
+in heavy dependencies at load time, and stay within an import-time budget."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = {"Bio", "yaml", "requests", "matplotlib", "seaborn", "numpy", "pyarrow"}
+
+# Cumulative import time (microseconds) allowed on top of bare interpreter startup
+IMPORT_BUDGET_US = 100_000
+
+def importtime(*args):
+    """Run python -X importtime and return {top-level module: cumulative us}."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", *args],
+                          cwd=REPO, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        modules[name.rstrip()] = int(cumulative)
+    return modules
+
+def imported_names(modules):
+    return {name.strip().split(".")[0] for name in modules}
+
+def added_import_time(modules, baseline):
+    """Sum cumulative time of top-level imports not already done at startup."""
+    return sum(us for name, us in modules.items()
+               if not name.startswith(" ") and name not in baseline)
+
+BASELINE = importtime("-c", "pass")
+
+def check_startup(modules):
+    assert not imported_names(modules) & HEAVY_MODULES
+    assert added_import_time(modules, BASELINE) < IMPORT_BUDGET_US
+
+def test_import_kunitz():
+    check_startup(importtime("-c", "import kunitz"))
+
+def test_cli_help():
+    check_startup(importtime("kunitz.py", "--help"))
+
+def test_cli_path_modules_stay_light():
+    modules = importtime("-c", "import hmm, report, gridsearch")
+    assert not imported_names(modules) & HEAVY_MODULES
@@ -1,7 +1,6 @@
-import matplotlib.pyplot as plt
-
 def plot_confusion_bar(metrics, output_path):
     """Plot confusion matrix as a bar chart."""
+    import matplotlib.pyplot as plt
     labels = ['TP', 'FP', 'FN', 'TN']
     values = [metrics['TP'], metrics['FP'], metrics['FN'], metrics['TN']]
     plt.figure(figsize=(6,4))
@@ -18,6 +17,7 @@ def plot_confusion_bar(metrics, output_path):
 
 def plot_metrics_summary(metrics, output_path):
     """Plot precision, recall, accuracy, F1 as a bar chart."""
+    import matplotlib.pyplot as plt
     labels = ['Accuracy', 'Precision', 'Recall', 'F1']
     values = [metrics['accuracy'], metrics['precision'], metrics['recall'], metrics['f1']]
     plt.figure(figsize=(6,4))